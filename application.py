@@ -4,55 +4,271 @@ import sys
 import time
 import os
 import struct
-from datetime import datetime  
+import ctypes
+import errno
+import mmap
+import selectors
+from drtp_proto import (FLAG_ACK, FLAG_SYN, FLAG_FIN, BUFFER_SIZE, HDR, HEADER_SIZE,
+                        ACK_FIELD, ACK_OFFSET, CHUNK_SIZE, RECV_WINDOW, RECV_BATCH)
+
+try:
+    import drtp_io  # Optional native transfer loops (cythonize -3 --inplace drtp_io.pyx)
+except ImportError:
+    drtp_io = None
 
 # --- Constants ---
-TIMEOUT = 0.4       # Timeout in seconds to wait for ACK before retransmitting
-FLAG_ACK = 0b0001   # Binary flag to mark ACK packet
-FLAG_SYN = 0b0010   # Binary flag to mark SYN packet (connection setup)
-FLAG_FIN = 0b0100   # Binary flag to mark FIN packet (connection teardown)
-BUFFER_SIZE = 1000  # Size of each UDP packet (8-byte header + 992 bytes of data)
+TIMEOUT = 0.4       # Timeout in seconds to wait for ACK before retransmitting (initial RTO)
+MIN_RTO = 0.05      # Lower bound in seconds for the adaptive retransmission timeout
+MAX_RTO = 2.0       # Upper bound in seconds for the backed-off retransmission timeout
+FILE_BUFFER_SIZE = 1 << 20  # Userspace buffer for the received file (coalesces writes)
+SOCKET_BUFFER_SIZE = 8 << 20  # Requested SO_RCVBUF/SO_SNDBUF to absorb bursts (kernel may cap it)
+VERBOSE = False     # Per-packet logging in the data-transfer loops (set with -v)
 
 # - Utility logging function with timestamp -
+# The wall clock is read once at startup; log timestamps are that local time of day
+# plus monotonic_ns() deltas, formatted with integer math (no datetime/strftime per call)
+_T0_WALL_NS = time.time_ns()
+_T0_MONO_NS = time.monotonic_ns()
+_t0 = time.localtime(_T0_WALL_NS // 1_000_000_000)
+_T0_DAY_MS = (_t0.tm_hour * 3600 + _t0.tm_min * 60 + _t0.tm_sec) * 1000 + _T0_WALL_NS // 1_000_000 % 1000
+
 def log(message):
-    now = datetime.now().strftime('%H:%M:%S.%f')[:-3]  
-    print(f"{now} -- {message}")
+    ms = (_T0_DAY_MS + (time.monotonic_ns() - _T0_MONO_NS) // 1_000_000) % 86_400_000
+    hours, ms = divmod(ms, 3_600_000)
+    minutes, ms = divmod(ms, 60_000)
+    seconds, ms = divmod(ms, 1000)
+    sys.stdout.write(f"{hours:02d}:{minutes:02d}:{seconds:02d}.{ms:03d} -- {message}\n")
 
 # - Packet construction -
 def create_packet(seq_num, ack_num, flags, recv_window, data=b''):
-    # Create a UDP "packet" with a simple custom header and optional data payload
-    header = struct.pack('!HHHH', seq_num, ack_num, flags, recv_window)
-    return header + data
+    # Create a UDP "packet" with a simple custom header and optional data payload;
+    # header and data are written into one buffer so no concatenation is needed
+    packet = bytearray(HEADER_SIZE + len(data))
+    HDR.pack_into(packet, 0, seq_num, ack_num, flags, recv_window)
+    packet[HEADER_SIZE:] = data
+    return packet
 
 # - Packet parsing -
 def parse_packet(packet):
-    # Unpack a received UDP packet into its components: header fields and data
-    header = packet[:8]
-    data = packet[8:]
-    seq_num, ack_num, flags, recv_window = struct.unpack('!HHHH', header)
-    return seq_num, ack_num, flags, recv_window, data
+    # Unpack a received UDP packet (a memoryview into the receive buffer) into its
+    # header fields and data; the data is a view and is only valid until the next receive
+    seq_num, ack_num, flags, recv_window = HDR.unpack_from(packet, 0)
+    return seq_num, ack_num, flags, recv_window, packet[HEADER_SIZE:]
+
+# - Socket buffer sizing -
+def set_socket_buffers(sock, size=SOCKET_BUFFER_SIZE):
+    # Ask for large kernel send/receive buffers and log what the kernel actually granted
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, size)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, size)
+    rcvbuf = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+    sndbuf = sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
+    log(f"Socket buffers: SO_RCVBUF = {rcvbuf} bytes, SO_SNDBUF = {sndbuf} bytes")
+
+# - Scatter-gather transmit -
+def send_pkt(sock, hdr_bytes, data_bytes, addr):
+    # Send header and payload as two iovecs so they never have to be concatenated
+    while True:
+        try:
+            sock.sendmsg([hdr_bytes, data_bytes], [], 0, addr)
+            return
+        except BlockingIOError:
+            _wait_writable(sock)
+
+def _wait_writable(sock, timeout=1.0):
+    # Block until a non-blocking socket has room in its send buffer again
+    with selectors.DefaultSelector() as selector:
+        selector.register(sock, selectors.EVENT_WRITE)
+        selector.select(timeout)
+
+def _buffer_address(buf):
+    # Address of the first byte of a writable buffer (bytearray, mmap view), for iovec construction
+    return ctypes.addressof((ctypes.c_char * len(buf)).from_buffer(buf))
+
+def sockaddr_in(addr):
+    # Pack an (ip, port) tuple into a struct sockaddr_in for the native send paths
+    ip, port = addr
+    return (struct.pack('=H', socket.AF_INET) + struct.pack('!H', port)
+            + socket.inet_aton(socket.gethostbyname(ip)) + bytes(8))
+
+# - Batched transmit (sendmmsg) -
+class _IOVec(ctypes.Structure):
+    _fields_ = [('iov_base', ctypes.c_void_p), ('iov_len', ctypes.c_size_t)]
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [('msg_name', ctypes.c_void_p), ('msg_namelen', ctypes.c_uint32),
+                ('msg_iov', ctypes.POINTER(_IOVec)), ('msg_iovlen', ctypes.c_size_t),
+                ('msg_control', ctypes.c_void_p), ('msg_controllen', ctypes.c_size_t),
+                ('msg_flags', ctypes.c_int)]
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [('msg_hdr', _MsgHdr), ('msg_len', ctypes.c_uint)]
+
+_libc = ctypes.CDLL(None, use_errno=True) if sys.platform.startswith('linux') else None
+_sendmmsg = getattr(_libc, 'sendmmsg', None)
+if _sendmmsg is not None:
+    _sendmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint, ctypes.c_int]
+    _sendmmsg.restype = ctypes.c_int
+
+class BatchSender:
+    # Sends a list of (header, data) packets to one peer with a single sendmmsg()
+    # call (Linux), falling back to one sendmsg() per packet elsewhere. The
+    # mmsghdr/iovec arrays are allocated once per connection and reused for every batch.
+    def __init__(self, sock, addr, max_batch):
+        self.sock = sock
+        self.addr = addr
+        self.max_batch = max_batch
+        if _sendmmsg is None:
+            return
+        self.sockaddr = ctypes.create_string_buffer(sockaddr_in(addr))
+        self.iovecs = (_IOVec * (2 * max_batch))()  # Header and payload iovec per message
+        self.msgs = (_MMsgHdr * max_batch)()
+        for i in range(max_batch):
+            hdr = self.msgs[i].msg_hdr
+            hdr.msg_name = ctypes.addressof(self.sockaddr)
+            hdr.msg_namelen = 16
+            hdr.msg_iov = ctypes.pointer(self.iovecs[2 * i])
+            hdr.msg_iovlen = 2
+
+    def send_batch(self, pkts):
+        if _sendmmsg is None:
+            for hdr, data in pkts:
+                send_pkt(self.sock, hdr, data, self.addr)
+            return
+        for start in range(0, len(pkts), self.max_batch):
+            batch = pkts[start:start + self.max_batch]
+            for i, (hdr, data) in enumerate(batch):
+                self.iovecs[2 * i].iov_base = _buffer_address(hdr)
+                self.iovecs[2 * i].iov_len = len(hdr)
+                self.iovecs[2 * i + 1].iov_base = _buffer_address(data)
+                self.iovecs[2 * i + 1].iov_len = len(data)
+            sent = 0
+            while sent < len(batch):
+                n = _sendmmsg(self.sock.fileno(), ctypes.byref(self.msgs[sent]), len(batch) - sent, 0)
+                if n < 0:
+                    err = ctypes.get_errno()
+                    if err in (errno.EAGAIN, errno.EWOULDBLOCK):
+                        _wait_writable(self.sock)  # Send buffer full: retry the unsent part
+                        continue
+                    if err == errno.EINTR:
+                        continue
+                    raise OSError(err, os.strerror(err))
+                sent += n
+
+# - Batched receive (recvmmsg) -
+_recvmmsg = getattr(_libc, 'recvmmsg', None)
+if _recvmmsg is not None:
+    _recvmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint, ctypes.c_int, ctypes.c_void_p]
+    _recvmmsg.restype = ctypes.c_int
+
+class BatchReceiver:
+    # Drains every datagram already queued on a socket with one non-blocking
+    # recvmmsg() call (Linux) into a fixed set of pre-allocated buffers. Elsewhere
+    # drain() returns nothing and the caller falls back to one recv per packet.
+    # The returned views are only valid until the next drain().
+    def __init__(self, sock, vlen):
+        self.sock = sock
+        self.vlen = vlen
+        if _recvmmsg is None:
+            return
+        self.buf = bytearray(BUFFER_SIZE * vlen)
+        self.mv = memoryview(self.buf)
+        self.iovecs = (_IOVec * vlen)()
+        self.msgs = (_MMsgHdr * vlen)()
+        base = _buffer_address(self.buf)
+        for i in range(vlen):
+            self.iovecs[i].iov_base = base + i * BUFFER_SIZE
+            self.iovecs[i].iov_len = BUFFER_SIZE
+            self.msgs[i].msg_hdr.msg_iov = ctypes.pointer(self.iovecs[i])
+            self.msgs[i].msg_hdr.msg_iovlen = 1
+
+    def drain(self):
+        if _recvmmsg is None:
+            return []
+        n = _recvmmsg(self.sock.fileno(), self.msgs, self.vlen, socket.MSG_DONTWAIT, None)
+        if n < 0:
+            err = ctypes.get_errno()
+            if err in (errno.EAGAIN, errno.EWOULDBLOCK):
+                return []
+            raise OSError(err, os.strerror(err))
+        return [self.mv[i * BUFFER_SIZE:i * BUFFER_SIZE + self.msgs[i].msg_len] for i in range(n)]
+
+# - Server receive loop -
+def receive_file(server_socket, f, client_address, discard_flag, rx_buf):
+    # Receive data packets and write them to f in order until a FIN arrives.
+    # Returns True if the FIN was received; the caller acknowledges it.
+    rx_mv = memoryview(rx_buf)
+    discarded = False  # Track if we've discarded a packet (used for loss simulation)
+    expected_seq = 0   # Next in-order packet to write to the file
+    out_of_order = {}  # Packets received ahead of expected_seq (Selective Repeat buffer)
+    receiver = BatchReceiver(server_socket, RECV_BATCH)
+    ack_buf = create_packet(0, 0, FLAG_ACK, 0)  # ACK template; only the ack number changes
+    while True:
+        try:
+            # Block for one datagram, then drain whatever else is already queued
+            nbytes, client_address = server_socket.recvfrom_into(rx_buf, BUFFER_SIZE)
+            batch = [rx_mv[:nbytes]]
+            batch.extend(receiver.drain())
+        except socket.timeout:
+            log("Timeout waiting for data.")
+            return False
+
+        in_order = []  # Payloads ready for the file, flushed once per batch
+        for packet in batch:
+            seq, ack, flags, recv_window, data = parse_packet(packet)
+
+            # Simulate packet loss (optional)
+            if discard_flag and not discarded and data:
+                log(f"Intentionally discarding packet with seq = {seq}")
+                discarded = True
+                continue
+
+            if flags & FLAG_FIN:
+                f.writelines(in_order)
+                return True
+
+            # Acknowledge every packet individually, then save data in order
+            if VERBOSE:
+                log(f"packet {seq} is received")
+                log(f"sending ack for the received {seq}")
+            ACK_FIELD.pack_into(ack_buf, ACK_OFFSET, seq)
+            server_socket.sendto(ack_buf, client_address)
+            if seq == expected_seq:
+                in_order.append(data)
+                expected_seq += 1
+                while expected_seq in out_of_order:
+                    in_order.append(out_of_order.pop(expected_seq))
+                    expected_seq += 1
+            elif seq > expected_seq:
+                out_of_order[seq] = bytes(data)  # Copy out of the reused receive buffers
+
+        # Must happen before the next receive overwrites the buffers the views point into
+        f.writelines(in_order)
 
 # - Server Logic -
 def server(ip, port, discard_flag):
     # Bind to a UDP port and wait for a connection
+    start_ns = time.monotonic_ns()  # Always defined, even if the handshake is cut short
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    set_socket_buffers(server_socket)
     server_socket.bind((ip, port))
+    rx_buf = bytearray(BUFFER_SIZE)  # Reused for every receive on this socket
+    rx_mv = memoryview(rx_buf)
     log(f"Listening on {ip}:{port}")
 
     # 3-Way Handshake (Connection Establishment)
-    data, client_address = server_socket.recvfrom(BUFFER_SIZE)
-    seq, ack, flags, recv_window, _ = parse_packet(data)
+    nbytes, client_address = server_socket.recvfrom_into(rx_buf, BUFFER_SIZE)
+    seq, ack, flags, recv_window, _ = parse_packet(rx_mv[:nbytes])
     if flags & FLAG_SYN:
         log("SYN packet is received")
-        server_socket.sendto(create_packet(0, 0, FLAG_SYN | FLAG_ACK, 15), client_address)
+        server_socket.sendto(create_packet(0, 0, FLAG_SYN | FLAG_ACK, RECV_WINDOW), client_address)
         log("SYN-ACK packet is sent")
-        data, _ = server_socket.recvfrom(BUFFER_SIZE)
-        ack_seq, ack_ack, ack_flags, _, _ = parse_packet(data)
+        nbytes, _ = server_socket.recvfrom_into(rx_buf, BUFFER_SIZE)
+        ack_seq, ack_ack, ack_flags, _, _ = parse_packet(rx_mv[:nbytes])
         if ack_flags & FLAG_ACK:
             log("ACK packet is received")
             log("Connection established")
             print("\nData Transfer:\n")
-            start_time = time.time()
+            start_ns = time.monotonic_ns()  # Measure from the end of the handshake
         else:
             log("Invalid ACK, closing connection.")
             return
@@ -62,53 +278,119 @@ def server(ip, port, discard_flag):
 
     filename = f"received_file_{int(time.time())}"  # Unique filename for saving received data
 
-    discarded = False  # Track if we've discarded a packet (used for loss simulation)
-    with open(filename, 'wb') as f:
-        while True:
-            try:
-                packet, client_address = server_socket.recvfrom(BUFFER_SIZE)
-                seq, ack, flags, recv_window, data = parse_packet(packet)
-
-                # Simulate packet loss (optional)
-                if discard_flag and not discarded and data:
-                    log(f"Intentionally discarding packet with seq = {seq}")
-                    discarded = True
-                    continue
-
-                # Handle connection teardown
-                if flags & FLAG_FIN:
-                    print("\nConnection Teardown:\n")
-                    log("FIN packet is received")
-                    server_socket.sendto(create_packet(0, 0, FLAG_FIN | FLAG_ACK, 0), client_address)
-                    log("FIN ACK packet is sent")
-                    break
-
-                # Acknowledge and save data
-                log(f"packet {seq} is received")
-                log(f"sending ack for the received {seq}")
-                server_socket.sendto(create_packet(0, seq, FLAG_ACK, 0), client_address)
-                f.write(data)
+    with open(filename, 'wb', buffering=FILE_BUFFER_SIZE) as f:
+        if drtp_io is not None and not discard_flag and not VERBOSE:
+            # Native receive loop writes straight to the file descriptor
+            fin_received = drtp_io.server_receive(server_socket.fileno(), f.fileno(), sockaddr_in(client_address))
+        else:
+            fin_received = receive_file(server_socket, f, client_address, discard_flag, rx_buf)
 
-            except socket.timeout:
-                log("Timeout waiting for data.")
-                break
+    # Handle connection teardown
+    if fin_received:
+        print("\nConnection Teardown:\n")
+        log("FIN packet is received")
+        server_socket.sendto(create_packet(0, 0, FLAG_FIN | FLAG_ACK, 0), client_address)
+        log("FIN ACK packet is sent")
 
-    end_time = time.time()
-    throughput_mbps = calculate_throughput(filename, start_time, end_time)
+    end_ns = time.monotonic_ns()
+    throughput_mbps = calculate_throughput(filename, start_ns, end_ns)
     log(f"The throughput is {throughput_mbps:.2f} Mbps")
     log("Connection closes")
     server_socket.close()
 
 # - Throughput calculator -
-def calculate_throughput(filename, start_time, end_time):
-    elapsed_time = end_time - start_time
+def calculate_throughput(filename, start_ns, end_ns):
+    elapsed_time = (end_ns - start_ns) / 1e9  # Monotonic nanoseconds -> seconds
     file_size_bytes = os.path.getsize(filename)
     return (file_size_bytes * 8) / (elapsed_time * 1_000_000)  # Mbps
 
+# - Client sliding-window loop -
+def send_file(client_socket, server_address, chunks, window_size, rx_buf):
+    # Send every chunk with Selective Repeat and return once all are acknowledged
+    rx_mv = memoryview(rx_buf)
+    base = 0             # First unacknowledged packet
+    next_seq = 0         # Next packet to send
+    total = len(chunks)
+    acked = [False] * total
+    # Every header field of a data packet is fixed per chunk, so build all headers once
+    # up front; each packet is sent as (header, chunk) without copying the chunk
+    packets = [(create_packet(i, 0, 0, window_size), c) for i, c in enumerate(chunks)]
+    sender = BatchSender(client_socket, server_address, window_size)
+
+    # Non-blocking socket driven by a selector: ACKs are read as soon as they arrive
+    # and new packets go out whenever the window has room
+    client_socket.setblocking(False)
+    selector = selectors.DefaultSelector()
+    selector.register(client_socket, selectors.EVENT_READ)
+    last_tx = time.monotonic()  # Retransmission deadline is last_tx + rto
+
+    # Adaptive retransmission timeout (Jacobson/Karn): smoothed RTT and its variance
+    rto = TIMEOUT
+    srtt = None
+    rttvar = 0.0
+    send_time = [0.0] * total
+    retransmitted = [False] * total  # Karn: never take RTT samples from these
+
+    # Sliding window transmission loop
+    while base < total:
+        # Collect every packet the window allows, then flush them in one batch
+        first_new = next_seq
+        pending = []
+        while next_seq < base + window_size and next_seq < total:
+            pending.append(packets[next_seq])
+            if VERBOSE:
+                log(f"packet with seq = {next_seq} is sent, sliding window = {{{', '.join(str(i) for i in range(base, next_seq + 1))}}}")
+            next_seq += 1
+        if pending:
+            sender.send_batch(pending)
+            last_tx = time.monotonic()
+            for i in range(first_new, next_seq):
+                send_time[i] = last_tx
+
+        # Drain every ACK that is ready so the window slides once per burst
+        remaining = last_tx + rto - time.monotonic()
+        if remaining > 0 and selector.select(remaining):
+            now = time.monotonic()
+            try:
+                while True:
+                    nbytes, _ = client_socket.recvfrom_into(rx_buf, BUFFER_SIZE)
+                    _, ack_num, flags, _, _ = parse_packet(rx_mv[:nbytes])
+                    if flags & FLAG_ACK and ack_num < total:
+                        if VERBOSE:
+                            log(f"ACK for packet = {ack_num} is received")
+                        if not acked[ack_num] and not retransmitted[ack_num]:
+                            rtt = now - send_time[ack_num]
+                            if srtt is None:
+                                srtt, rttvar = rtt, rtt / 2
+                            else:
+                                rttvar = 0.75 * rttvar + 0.25 * abs(rtt - srtt)
+                                srtt = 0.875 * srtt + 0.125 * rtt
+                            rto = max(MIN_RTO, srtt + 4 * rttvar)
+                        acked[ack_num] = True
+            except BlockingIOError:
+                pass
+            while base < total and acked[base]:
+                base += 1  # Move the window forward past every acknowledged packet
+        elif time.monotonic() >= last_tx + rto:
+            # Selective Repeat: only resend packets in the window that are still unacknowledged
+            missing = [i for i in range(base, next_seq) if not acked[i]]
+            log(f"Timeout after {rto * 1000:.0f} ms! Resending {len(missing)} unacknowledged packet(s)...")
+            sender.send_batch([packets[i] for i in missing])
+            for i in missing:
+                retransmitted[i] = True
+            rto = min(MAX_RTO, 2 * rto)  # Back off until a fresh RTT sample arrives
+            last_tx = time.monotonic()
+
+    selector.close()
+    client_socket.settimeout(TIMEOUT)
+
 # - Client Logic -
 def client(ip, port, filename, window_size):
     client_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    set_socket_buffers(client_socket)
     client_socket.settimeout(TIMEOUT)
+    rx_buf = bytearray(BUFFER_SIZE)  # Reused for every receive on this socket
+    rx_mv = memoryview(rx_buf)
     server_address = (ip, port)
 
     # 3-Way Handshake (Client Initiated)
@@ -116,8 +398,8 @@ def client(ip, port, filename, window_size):
     client_socket.sendto(create_packet(0, 0, FLAG_SYN, window_size), server_address)
     log("SYN packet is sent")
 
-    data, _ = client_socket.recvfrom(BUFFER_SIZE)
-    seq, ack, flags, recv_window, _ = parse_packet(data)
+    nbytes, _ = client_socket.recvfrom_into(rx_buf, BUFFER_SIZE)
+    seq, ack, flags, recv_window, _ = parse_packet(rx_mv[:nbytes])
     if flags & FLAG_SYN and flags & FLAG_ACK:
         log("SYN-ACK packet is received")
         window_size = min(window_size, recv_window)  # 
@@ -131,54 +413,44 @@ def client(ip, port, filename, window_size):
         return
 
     print("\nData Transfer:\n")
-    # Read the file into chunks of 992 bytes each
+    # Map the file and split it into zero-copy CHUNK_SIZE-byte views. ACCESS_COPY gives a
+    # private writable mapping (pages are never written) so the views can back iovecs
     with open(filename, 'rb') as f:
-        chunks = []
-        chunk = f.read(992)
-        while chunk:
-            chunks.append(chunk)
-            chunk = f.read(992)
-
-    base = 0             # First unacknowledged packet
-    next_seq = 0         # Next packet to send
-    total = len(chunks)
-    start_time = time.time()
+        file_size = os.fstat(f.fileno()).st_size
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY) if file_size else None
+    file_view = memoryview(mm) if mm is not None else memoryview(b'')
+    chunks = [file_view[i:i + CHUNK_SIZE] for i in range(0, file_size, CHUNK_SIZE)]
 
-    # Sliding window transmission loop
-    while base < total:
-        # Send new packets within the window
-        while next_seq < base + window_size and next_seq < total:
-            pkt = create_packet(next_seq, 0, 0, window_size, chunks[next_seq])
-            client_socket.sendto(pkt, server_address)
-            log(f"packet with seq = {next_seq} is sent, sliding window = {{{', '.join(str(i) for i in range(base, next_seq + 1))}}}")
-            next_seq += 1
+    start_ns = time.monotonic_ns()
+    if drtp_io is not None and not VERBOSE and chunks:
+        # Native sliding-window loop: same Selective Repeat / adaptive RTO, no per-packet logs
+        timeouts = drtp_io.client_transfer(client_socket.fileno(), sockaddr_in(server_address), file_view,
+                                           len(chunks), window_size, TIMEOUT, MIN_RTO, MAX_RTO)
+        if timeouts:
+            log(f"{timeouts} retransmission timeout(s) during transfer")
+    else:
+        send_file(client_socket, server_address, chunks, window_size, rx_buf)
 
-        # Wait for ACK
-        try:
-            ack_pkt, _ = client_socket.recvfrom(BUFFER_SIZE)
-            _, ack_num, flags, _, _ = parse_packet(ack_pkt)
-            if flags & FLAG_ACK:
-                log(f"ACK for packet = {ack_num} is received")
-                base = ack_num + 1  # Move the window forward
-        except socket.timeout:
-            log("Timeout! Resending from base...")
-            next_seq = base  # Retransmit from base
+    # Every view into the mapping must be gone before it can be closed
+    chunks = None
+    file_view.release()
+    if mm is not None:
+        mm.close()
 
     # Connection Teardown (Client Side)
     print("\nConnection Teardown:\n")
     client_socket.sendto(create_packet(0, 0, FLAG_FIN, window_size), server_address)
     log("FIN packet is sent")
 
-    data, _ = client_socket.recvfrom(BUFFER_SIZE)
-    _, _, flags, _, _ = parse_packet(data)
+    nbytes, _ = client_socket.recvfrom_into(rx_buf, BUFFER_SIZE)
+    _, _, flags, _, _ = parse_packet(rx_mv[:nbytes])
     if flags & FLAG_ACK and flags & FLAG_FIN:
         log("FIN-ACK packet is received")
         log("Connection closes")
 
     # Report throughput
-    end_time = time.time()
-    file_size_bytes = os.path.getsize(filename)
-    throughput_mbps = (file_size_bytes * 8) / (end_time - start_time) / 1_000_000
+    end_ns = time.monotonic_ns()
+    throughput_mbps = (file_size * 8) / ((end_ns - start_ns) / 1e9) / 1_000_000
     log(f"The throughput is {throughput_mbps:.2f} Mbps")
     client_socket.close()
 
@@ -192,8 +464,11 @@ def main():
     parser.add_argument('-f', type=str, help="Filename to send (client only)")
     parser.add_argument('-w', type=int, default=3, help="Window size (default 3)")
     parser.add_argument('--discard', '-d', action='store_true', help="Discard first data packet (simulate packet loss)")
+    parser.add_argument('--verbose', '-v', action='store_true', help="Log every data packet and ACK")
 
     args = parser.parse_args()
+    global VERBOSE
+    VERBOSE = args.verbose
     if args.s:
         server(args.i, args.p, args.discard)
     elif args.c:
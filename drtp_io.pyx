@@ -0,0 +1,357 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+#
+# Native versions of the DRTP data-transfer loops in application.py. Connection
+# setup and teardown stay in Python; only the per-packet work runs here, calling
+# sendmmsg/recvmmsg/poll/writev directly on the socket and file descriptors.
+#
+# Build (Linux): cythonize -3 --inplace drtp_io.pyx
+# application.py falls back to its pure-Python loops when this module is missing.
+
+from libc.stdlib cimport malloc, calloc, free
+from libc.errno cimport errno, EAGAIN, EINTR  # EWOULDBLOCK == EAGAIN on Linux
+from posix.time cimport clock_gettime, timespec, CLOCK_MONOTONIC
+from cpython.bytes cimport PyBytes_FromStringAndSize, PyBytes_AS_STRING, PyBytes_GET_SIZE
+from cpython.exc cimport PyErr_CheckSignals, PyErr_SetFromErrno
+
+from drtp_proto import (FLAG_ACK as _FLAG_ACK, FLAG_FIN as _FLAG_FIN,
+                        BUFFER_SIZE as _BUFFER_SIZE, HEADER_SIZE as _HEADER_SIZE,
+                        CHUNK_SIZE as _CHUNK_SIZE, RECV_BATCH as _RECV_BATCH)
+
+cdef extern from "<sys/uio.h>":
+    struct iovec:
+        void *iov_base
+        size_t iov_len
+    ssize_t writev(int fd, const iovec *iov, int iovcnt)
+
+cdef extern from "<sys/socket.h>":
+    ctypedef unsigned int socklen_t
+    struct msghdr:
+        void *msg_name
+        socklen_t msg_namelen
+        iovec *msg_iov
+        size_t msg_iovlen
+        void *msg_control
+        size_t msg_controllen
+        int msg_flags
+    struct mmsghdr:
+        msghdr msg_hdr
+        unsigned int msg_len
+    int sendmmsg(int fd, mmsghdr *msgvec, unsigned int vlen, int flags)
+    int recvmmsg(int fd, mmsghdr *msgvec, unsigned int vlen, int flags, timespec *timeout)
+    ssize_t recv(int fd, void *buf, size_t n, int flags)
+    int MSG_DONTWAIT
+    int MSG_WAITFORONE
+
+cdef extern from "<poll.h>":
+    struct pollfd:
+        int fd
+        short events
+        short revents
+    int poll(pollfd *fds, unsigned long nfds, int timeout)
+    short POLLIN
+    short POLLOUT
+
+cdef int FLAG_ACK = _FLAG_ACK
+cdef int FLAG_FIN = _FLAG_FIN
+cdef int BUFFER_SIZE = _BUFFER_SIZE
+cdef int HEADER_SIZE = _HEADER_SIZE
+cdef int CHUNK_SIZE = _CHUNK_SIZE
+cdef int RECV_BATCH = _RECV_BATCH
+
+# - Header helpers ('!IIHH': seq, ack, flags, window) -
+cdef inline void put_u32(unsigned char *p, unsigned int v) noexcept:
+    p[0] = (v >> 24) & 0xff
+    p[1] = (v >> 16) & 0xff
+    p[2] = (v >> 8) & 0xff
+    p[3] = v & 0xff
+
+cdef inline void put_u16(unsigned char *p, unsigned int v) noexcept:
+    p[0] = (v >> 8) & 0xff
+    p[1] = v & 0xff
+
+cdef inline unsigned int get_u32(const unsigned char *p) noexcept:
+    return (<unsigned int>p[0] << 24) | (<unsigned int>p[1] << 16) | (<unsigned int>p[2] << 8) | p[3]
+
+cdef inline unsigned int get_u16(const unsigned char *p) noexcept:
+    return (<unsigned int>p[0] << 8) | p[1]
+
+cdef inline double monotonic() noexcept:
+    cdef timespec ts
+    clock_gettime(CLOCK_MONOTONIC, &ts)
+    return ts.tv_sec + ts.tv_nsec * 1e-9
+
+cdef int wait_fd(int fd, short events, double seconds) except -1:
+    # poll() one descriptor; returns 1 if ready, 0 on timeout (EINTR counts as a timeout)
+    cdef pollfd pfd
+    pfd.fd = fd
+    pfd.events = events
+    pfd.revents = 0
+    cdef int r = poll(&pfd, 1, <int>(seconds * 1000) + 1 if seconds > 0 else 0)
+    if r < 0:
+        if errno == EINTR:
+            PyErr_CheckSignals()
+            return 0
+        PyErr_SetFromErrno(OSError)
+        return -1
+    return r
+
+cdef int send_all(int fd, mmsghdr *msgs, unsigned int n) except -1:
+    # sendmmsg() until every message is out, waiting for room if the socket is full
+    cdef unsigned int sent = 0
+    cdef int r
+    while sent < n:
+        r = sendmmsg(fd, msgs + sent, n - sent, 0)
+        if r < 0:
+            if errno == EAGAIN:
+                wait_fd(fd, POLLOUT, 1.0)
+                continue
+            if errno == EINTR:
+                PyErr_CheckSignals()
+                continue
+            PyErr_SetFromErrno(OSError)
+            return -1
+        sent += r
+    return 0
+
+cdef int write_all(int fd, iovec *iov, int cnt) except -1:
+    # writev() the whole vector, resuming after short writes
+    cdef ssize_t r
+    while cnt > 0:
+        r = writev(fd, iov, cnt)
+        if r < 0:
+            if errno == EINTR:
+                PyErr_CheckSignals()
+                continue
+            PyErr_SetFromErrno(OSError)
+            return -1
+        while cnt > 0 and <size_t>r >= iov[0].iov_len:
+            r -= iov[0].iov_len
+            iov += 1
+            cnt -= 1
+        if cnt > 0:
+            iov[0].iov_base = <unsigned char *>iov[0].iov_base + r
+            iov[0].iov_len -= r
+    return 0
+
+# - Client: Selective Repeat sliding window with adaptive RTO -
+def client_transfer(int fd, bytes addr_bytes, const unsigned char[:] mmap_buf, int total,
+                    int window_size, double timeout=0.4, double min_rto=0.05, double max_rto=2.0):
+    """Send ``total`` CHUNK_SIZE chunks of ``mmap_buf`` to the peer in ``addr_bytes``
+    (a packed sockaddr_in) and return once all are acknowledged. Returns the number of
+    retransmission timeouts."""
+    cdef Py_ssize_t size = mmap_buf.shape[0]
+    if total <= 0:
+        return 0
+    cdef const unsigned char *data = &mmap_buf[0]
+    cdef const char *addr = PyBytes_AS_STRING(addr_bytes)
+    cdef socklen_t addr_len = <socklen_t>PyBytes_GET_SIZE(addr_bytes)
+
+    cdef unsigned char *headers = <unsigned char *>malloc(<size_t>total * HEADER_SIZE)
+    cdef char *acked = <char *>calloc(total, 1)
+    cdef char *retransmitted = <char *>calloc(total, 1)  # Karn: never take RTT samples from these
+    cdef double *send_time = <double *>malloc(<size_t>total * sizeof(double))
+    cdef mmsghdr *msgs = <mmsghdr *>calloc(window_size, sizeof(mmsghdr))
+    cdef iovec *iovs = <iovec *>calloc(2 * window_size, sizeof(iovec))
+    cdef unsigned char *rx = <unsigned char *>malloc(BUFFER_SIZE)
+    if not (headers and acked and retransmitted and send_time and msgs and iovs and rx):
+        free(headers); free(acked); free(retransmitted); free(send_time); free(msgs); free(iovs); free(rx)
+        raise MemoryError()
+
+    cdef int i, n, seq
+    cdef int base = 0
+    cdef int next_seq = 0
+    cdef int timeouts = 0
+    cdef ssize_t nbytes
+    cdef unsigned int ack_num
+    cdef Py_ssize_t offset
+    cdef double now, rtt, last_tx, remaining
+    cdef double rto = timeout
+    cdef double srtt = -1.0
+    cdef double rttvar = 0.0
+
+    try:
+        # Every header field is fixed per chunk, so build all headers once
+        for i in range(total):
+            put_u32(headers + i * HEADER_SIZE, i)
+            put_u32(headers + i * HEADER_SIZE + 4, 0)
+            put_u16(headers + i * HEADER_SIZE + 8, 0)
+            put_u16(headers + i * HEADER_SIZE + 10, window_size)
+        for i in range(window_size):
+            msgs[i].msg_hdr.msg_name = <void *>addr
+            msgs[i].msg_hdr.msg_namelen = addr_len
+            msgs[i].msg_hdr.msg_iov = iovs + 2 * i
+            msgs[i].msg_hdr.msg_iovlen = 2
+
+        last_tx = monotonic()
+        while base < total:
+            # Send everything the window allows in one sendmmsg()
+            n = 0
+            while next_seq < base + window_size and next_seq < total:
+                offset = <Py_ssize_t>next_seq * CHUNK_SIZE
+                iovs[2 * n].iov_base = headers + next_seq * HEADER_SIZE
+                iovs[2 * n].iov_len = HEADER_SIZE
+                iovs[2 * n + 1].iov_base = <void *>(data + offset)
+                iovs[2 * n + 1].iov_len = min(CHUNK_SIZE, size - offset)
+                n += 1
+                next_seq += 1
+            if n:
+                send_all(fd, msgs, n)
+                last_tx = monotonic()
+                for seq in range(next_seq - n, next_seq):
+                    send_time[seq] = last_tx
+
+            # Drain every ACK that is ready so the window slides once per burst
+            remaining = last_tx + rto - monotonic()
+            if remaining > 0 and wait_fd(fd, POLLIN, remaining):
+                now = monotonic()
+                while True:
+                    nbytes = recv(fd, rx, BUFFER_SIZE, MSG_DONTWAIT)
+                    if nbytes < 0:
+                        if errno == EAGAIN:
+                            break
+                        if errno == EINTR:
+                            PyErr_CheckSignals()
+                            continue
+                        PyErr_SetFromErrno(OSError)
+                    if nbytes < HEADER_SIZE or not (get_u16(rx + 8) & FLAG_ACK):
+                        continue
+                    ack_num = get_u32(rx + 4)
+                    if ack_num >= <unsigned int>total:
+                        continue
+                    if not acked[ack_num] and not retransmitted[ack_num]:
+                        rtt = now - send_time[ack_num]
+                        if srtt < 0:
+                            srtt = rtt
+                            rttvar = rtt / 2
+                        else:
+                            rttvar = 0.75 * rttvar + 0.25 * abs(rtt - srtt)
+                            srtt = 0.875 * srtt + 0.125 * rtt
+                        rto = max(min_rto, srtt + 4 * rttvar)
+                    acked[ack_num] = 1
+                while base < total and acked[base]:
+                    base += 1
+            elif monotonic() >= last_tx + rto:
+                # Selective Repeat: only resend packets in the window that are still unacknowledged
+                n = 0
+                for seq in range(base, next_seq):
+                    if acked[seq]:
+                        continue
+                    offset = <Py_ssize_t>seq * CHUNK_SIZE
+                    iovs[2 * n].iov_base = headers + seq * HEADER_SIZE
+                    iovs[2 * n].iov_len = HEADER_SIZE
+                    iovs[2 * n + 1].iov_base = <void *>(data + offset)
+                    iovs[2 * n + 1].iov_len = min(CHUNK_SIZE, size - offset)
+                    retransmitted[seq] = 1
+                    n += 1
+                send_all(fd, msgs, n)
+                timeouts += 1
+                rto = min(max_rto, 2 * rto)  # Back off until a fresh RTT sample arrives
+                last_tx = monotonic()
+    finally:
+        free(headers); free(acked); free(retransmitted); free(send_time); free(msgs); free(iovs); free(rx)
+    return timeouts
+
+# - Server: batched receive, in-order write, per-packet ACK -
+def server_receive(int fd, int file_fd, bytes addr_bytes):
+    """Receive data packets on ``fd`` and write them in order to ``file_fd``, ACKing
+    each one to the peer in ``addr_bytes`` (a packed sockaddr_in). Returns True once
+    a FIN arrives; the FIN itself is left for the caller to acknowledge."""
+    cdef const char *addr = PyBytes_AS_STRING(addr_bytes)
+    cdef socklen_t addr_len = <socklen_t>PyBytes_GET_SIZE(addr_bytes)
+
+    cdef unsigned char *bufs = <unsigned char *>malloc(RECV_BATCH * BUFFER_SIZE)
+    cdef unsigned char *ack_hdrs = <unsigned char *>malloc(RECV_BATCH * HEADER_SIZE)
+    cdef mmsghdr *rx_msgs = <mmsghdr *>calloc(RECV_BATCH, sizeof(mmsghdr))
+    cdef iovec *rx_iovs = <iovec *>calloc(RECV_BATCH, sizeof(iovec))
+    cdef mmsghdr *ack_msgs = <mmsghdr *>calloc(RECV_BATCH, sizeof(mmsghdr))
+    cdef iovec *ack_iovs = <iovec *>calloc(RECV_BATCH, sizeof(iovec))
+    cdef iovec *wr_iovs = <iovec *>calloc(RECV_BATCH, sizeof(iovec))
+    if not (bufs and ack_hdrs and rx_msgs and rx_iovs and ack_msgs and ack_iovs and wr_iovs):
+        free(bufs); free(ack_hdrs); free(rx_msgs); free(rx_iovs); free(ack_msgs); free(ack_iovs); free(wr_iovs)
+        raise MemoryError()
+
+    cdef int i, n, n_acks, n_writes, r
+    cdef unsigned int seq, flags
+    cdef unsigned int expected_seq = 0
+    cdef unsigned char *pkt
+    cdef Py_ssize_t length
+    out_of_order = {}  # Packets received ahead of expected_seq (Selective Repeat buffer)
+
+    try:
+        for i in range(RECV_BATCH):
+            rx_iovs[i].iov_base = bufs + i * BUFFER_SIZE
+            rx_iovs[i].iov_len = BUFFER_SIZE
+            rx_msgs[i].msg_hdr.msg_name = NULL
+            rx_msgs[i].msg_hdr.msg_namelen = 0
+            rx_msgs[i].msg_hdr.msg_iov = rx_iovs + i
+            rx_msgs[i].msg_hdr.msg_iovlen = 1
+            rx_msgs[i].msg_hdr.msg_control = NULL
+            rx_msgs[i].msg_hdr.msg_controllen = 0
+            rx_msgs[i].msg_hdr.msg_flags = 0
+            put_u32(ack_hdrs + i * HEADER_SIZE, 0)
+            put_u32(ack_hdrs + i * HEADER_SIZE + 4, 0)
+            put_u16(ack_hdrs + i * HEADER_SIZE + 8, FLAG_ACK)
+            put_u16(ack_hdrs + i * HEADER_SIZE + 10, 0)
+            ack_iovs[i].iov_base = ack_hdrs + i * HEADER_SIZE
+            ack_iovs[i].iov_len = HEADER_SIZE
+            ack_msgs[i].msg_hdr.msg_name = <void *>addr
+            ack_msgs[i].msg_hdr.msg_namelen = addr_len
+            ack_msgs[i].msg_hdr.msg_iov = ack_iovs + i
+            ack_msgs[i].msg_hdr.msg_iovlen = 1
+            ack_msgs[i].msg_hdr.msg_control = NULL
+            ack_msgs[i].msg_hdr.msg_controllen = 0
+            ack_msgs[i].msg_hdr.msg_flags = 0
+
+        while True:
+            # Block for the first datagram, then take whatever else is queued
+            n = recvmmsg(fd, rx_msgs, RECV_BATCH, MSG_WAITFORONE, NULL)
+            if n < 0:
+                if errno == EAGAIN:
+                    wait_fd(fd, POLLIN, 1.0)
+                    continue
+                if errno == EINTR:
+                    PyErr_CheckSignals()
+                    continue
+                PyErr_SetFromErrno(OSError)
+
+            n_acks = 0
+            n_writes = 0
+            for i in range(n):
+                pkt = bufs + i * BUFFER_SIZE
+                length = rx_msgs[i].msg_len
+                if length < HEADER_SIZE:
+                    continue
+                seq = get_u32(pkt)
+                flags = get_u16(pkt + 8)
+                if flags & FLAG_FIN:
+                    write_all(file_fd, wr_iovs, n_writes)
+                    send_all(fd, ack_msgs, n_acks)
+                    return True
+
+                # Acknowledge every packet individually, then save data in order
+                put_u32(ack_hdrs + n_acks * HEADER_SIZE + 4, seq)
+                n_acks += 1
+                if seq == expected_seq:
+                    wr_iovs[n_writes].iov_base = pkt + HEADER_SIZE
+                    wr_iovs[n_writes].iov_len = length - HEADER_SIZE
+                    n_writes += 1
+                    expected_seq += 1
+                    if expected_seq in out_of_order:
+                        # Rare path: flush what we have, then the buffered packets
+                        write_all(file_fd, wr_iovs, n_writes)
+                        n_writes = 0
+                        while expected_seq in out_of_order:
+                            data = out_of_order.pop(expected_seq)
+                            wr_iovs[0].iov_base = PyBytes_AS_STRING(data)
+                            wr_iovs[0].iov_len = PyBytes_GET_SIZE(data)
+                            write_all(file_fd, wr_iovs, 1)
+                            expected_seq += 1
+                elif seq > expected_seq:
+                    out_of_order[seq] = PyBytes_FromStringAndSize(<char *>pkt + HEADER_SIZE,
+                                                                  length - HEADER_SIZE)
+
+            # Must happen before the next receive overwrites the buffers
+            write_all(file_fd, wr_iovs, n_writes)
+            send_all(fd, ack_msgs, n_acks)
+    finally:
+        free(bufs); free(ack_hdrs); free(rx_msgs); free(rx_iovs); free(ack_msgs); free(ack_iovs); free(wr_iovs)
@@ -0,0 +1,15 @@
+import struct
+
+# --- DRTP protocol constants (shared by client and server) ---
+FLAG_ACK = 0b0001   # Binary flag to mark ACK packet
+FLAG_SYN = 0b0010   # Binary flag to mark SYN packet (connection setup)
+FLAG_FIN = 0b0100   # Binary flag to mark FIN packet (connection teardown)
+BUFFER_SIZE = 1000  # Size of each UDP packet (12-byte header + 988 bytes of data)
+HEADER_FORMAT = '!IIHH'  # 32-bit seq, 32-bit ack, 16-bit flags, 16-bit window
+HDR = struct.Struct(HEADER_FORMAT)  # Precompiled header layout
+HEADER_SIZE = HDR.size  # 12 bytes
+ACK_FIELD = struct.Struct('!I')  # Layout of the ack number on its own
+ACK_OFFSET = 4      # Byte offset of the ack number inside the header
+CHUNK_SIZE = BUFFER_SIZE - HEADER_SIZE  # 988 bytes of file data per packet
+RECV_WINDOW = 15    # Receive window the server advertises in its SYN-ACK
+RECV_BATCH = 32     # Max datagrams the server drains per recvmmsg() call